@@ -1,9 +1,28 @@
-import time,logging
-from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, ConversationHandler, filters
-from handlers import start, register_players, generate_grid, play_match, handle_winner, view_stats, end_game, REGISTER_PLAYERS, GENERATE_GRID, PLAY_MATCH, VIEW_STATS,force_end_game, show_monthly_stats,clear_database
-from config import BOT_TOKEN
-from database import initialize_database
-from telegram.error import TelegramError
+import time,logging,random
+from contextlib import contextmanager
+
+# Время импорта и инициализации по модулям (для режима профилирования запуска)
+STARTUP_TIMINGS = []
+
+@contextmanager
+def measure(label):
+    """Замеряет время выполнения блока и сохраняет его в STARTUP_TIMINGS."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS.append((label, time.perf_counter() - started))
+
+with measure("import config"):
+    from config import BOT_TOKEN, PROFILE_STARTUP
+with measure("import database"):
+    from database import initialize_database
+with measure("import telegram.ext"):
+    from telegram import Update
+    from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, ConversationHandler, TypeHandler, filters
+    from telegram.error import TelegramError
+with measure("import handlers"):
+    from handlers import start, register_players, generate_grid, play_match, handle_winner, view_stats, end_game, REGISTER_PLAYERS, GENERATE_GRID, PLAY_MATCH, VIEW_STATS,force_end_game, show_monthly_stats,clear_database
 
 # Настройка логгера
 logging.basicConfig(
@@ -15,57 +34,104 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Параметры перезапуска: экспоненциальная задержка со случайным разбросом
+RESTART_BACKOFF_BASE = 1  # секунды
+RESTART_BACKOFF_MAX = 60  # секунды
+# Если бот проработал дольше этого времени, счетчик неудачных попыток сбрасывается
+RESTART_STABLE_PERIOD = 300  # секунды
+
+# Состояние текущего запуска для замера времени до первого обновления
+run_state = {"started_at": None, "first_update_seen": True}
+
+def get_restart_delay(attempt):
+    """Возвращает задержку перед перезапуском (full jitter)."""
+    return random.uniform(0, min(RESTART_BACKOFF_MAX, RESTART_BACKOFF_BASE * 2 ** attempt))
+
+async def track_first_update(update: Update, context) -> None:
+    """Логирует время от запуска до получения первого обновления."""
+    if run_state["first_update_seen"]:
+        return
+    run_state["first_update_seen"] = True
+    elapsed = time.monotonic() - run_state["started_at"]
+    logger.info(f"Первое обновление получено через {elapsed:.3f} с после запуска.")
+
+def build_application():
+    """Создает приложение бота и регистрирует обработчики."""
+    application = ApplicationBuilder().token(BOT_TOKEN).read_timeout(30).build()
+
+    # Замер времени до первого обновления (группа -1 не мешает остальным обработчикам)
+    application.add_handler(TypeHandler(Update, track_first_update), group=-1)
+
+    # Создаем ConversationHandler
+    conv_handler = ConversationHandler(
+        entry_points=[CommandHandler('start', start)],
+        states={
+            REGISTER_PLAYERS: [MessageHandler(filters.TEXT, register_players)],
+            GENERATE_GRID: [MessageHandler(filters.TEXT & filters.Regex("^Начать игру$"), generate_grid)],
+            PLAY_MATCH: [
+                MessageHandler(
+                    filters.TEXT & ~filters.Regex("^(Начать игру|Статистика|Завершить игру|Завершить игру сейчас)$"),
+                    handle_winner
+                ),
+                MessageHandler(filters.TEXT & filters.Regex("^Начать игру$"), play_match),
+                MessageHandler(filters.TEXT & filters.Regex("^Завершить игру сейчас$"), force_end_game)
+            ],
+            VIEW_STATS: [
+                MessageHandler(filters.TEXT & filters.Regex("^Новый круг$"), generate_grid),
+                MessageHandler(filters.TEXT & filters.Regex("^Завершить игру$"), end_game),
+                MessageHandler(filters.TEXT & filters.Regex("^Статистика$"), show_monthly_stats)
+            ],
+        },
+        fallbacks=[
+            MessageHandler(filters.TEXT & filters.Regex("^Начать новую игру$"), start),
+        ]
+    )
+
+    # Добавляем ConversationHandler в приложение
+    application.add_handler(conv_handler)
+
+    # Добавляем команду для очистки базы данных
+    application.add_handler(CommandHandler('cleardb', clear_database))
+
+    return application
+
+def report_startup_timings():
+    """Выводит в лог время импорта и инициализации по модулям."""
+    total = sum(duration for _, duration in STARTUP_TIMINGS)
+    logger.info(f"Профилирование запуска: всего {total * 1000:.1f} мс")
+    for label, duration in STARTUP_TIMINGS:
+        logger.info(f"  {label}: {duration * 1000:.1f} мс")
+
 def main():
+    # Ресурсы инициализируются один раз и переживают перезапуски:
+    # схема БД, граф обработчиков и состояние диалогов (user_data, ConversationHandler)
+    with measure("initialize_database"):
+        initialize_database()
+    with measure("build_application"):
+        application = build_application()
+
+    if PROFILE_STARTUP:
+        report_startup_timings()
+
+    attempt = 0
     while True:  # Бесконечный цикл для автоподнятия бота
+        run_state["started_at"] = time.monotonic()
+        run_state["first_update_seen"] = False
         try:
-            # Инициализация базы данных
-            initialize_database()
-
-            # Создаем приложение бота
-            application = ApplicationBuilder().token(BOT_TOKEN).read_timeout(30).build()
-
-            # Создаем ConversationHandler
-            conv_handler = ConversationHandler(
-                entry_points=[CommandHandler('start', start)],
-                states={
-                    REGISTER_PLAYERS: [MessageHandler(filters.TEXT, register_players)],
-                    GENERATE_GRID: [MessageHandler(filters.TEXT & filters.Regex("^Начать игру$"), generate_grid)],
-                    PLAY_MATCH: [
-                        MessageHandler(
-                            filters.TEXT & ~filters.Regex("^(Начать игру|Статистика|Завершить игру|Завершить игру сейчас)$"),
-                            handle_winner
-                        ),
-                        MessageHandler(filters.TEXT & filters.Regex("^Начать игру$"), play_match),
-                        MessageHandler(filters.TEXT & filters.Regex("^Завершить игру сейчас$"), force_end_game)
-                    ],
-                    VIEW_STATS: [
-                        MessageHandler(filters.TEXT & filters.Regex("^Новый круг$"), generate_grid),
-                        MessageHandler(filters.TEXT & filters.Regex("^Завершить игру$"), end_game),
-                        MessageHandler(filters.TEXT & filters.Regex("^Статистика$"), show_monthly_stats)
-                    ],
-                },
-                fallbacks=[
-                    MessageHandler(filters.TEXT & filters.Regex("^Начать новую игру$"), start),
-                ]
-            )
-
-            # Добавляем ConversationHandler в приложение
-            application.add_handler(conv_handler)
-
-            # Добавляем команду для очистки базы данных
-            application.add_handler(CommandHandler('cleardb', clear_database))
-
-            # Запускаем бота
-            application.run_polling()
-
-        except TelegramError as e:
-            # Логируем ошибку
-            logger.error(f"Бот упал с ошибкой: {e}. Перезапуск через 5 секунд...")
-            time.sleep(5)  # Ждем 5 секунд перед перезапуском
+            # Запускаем бота; цикл событий не закрываем, чтобы приложение можно было запустить повторно
+            application.run_polling(close_loop=False)
+            break  # Штатная остановка (например, по Ctrl+C)
         except Exception as e:
-            # Логируем любые другие ошибки
-            logger.error(f"Неизвестная ошибка: {e}. Перезапуск через 5 секунд...")
-            time.sleep(5)  # Ждем 5 секунд перед перезапуском
+            if time.monotonic() - run_state["started_at"] > RESTART_STABLE_PERIOD:
+                attempt = 0
+            delay = get_restart_delay(attempt)
+            attempt += 1
+            # Логируем ошибку
+            if isinstance(e, TelegramError):
+                logger.error(f"Бот упал с ошибкой: {e}. Перезапуск через {delay:.1f} с (попытка {attempt})...")
+            else:
+                logger.error(f"Неизвестная ошибка: {e}. Перезапуск через {delay:.1f} с (попытка {attempt})...")
+            time.sleep(delay)  # Ждем перед перезапуском
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -8,4 +8,7 @@ load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
 # Имя файла базы данных
-DATABASE_NAME = os.getenv("DATABASE_NAME")
\ No newline at end of file
+DATABASE_NAME = os.getenv("DATABASE_NAME")
+
+# Режим профилирования запуска: выводит в лог время импорта и инициализации по модулям
+PROFILE_STARTUP = os.getenv("PROFILE_STARTUP") == "1"
\ No newline at end of file